@@ -1,457 +1,976 @@
-import random
-from enum import IntEnum
-import sys
-import argparse
-import math
-
-class Card:
-    def __init__(self, color, rank, value):
-        self.color = color
-        self.rank = rank
-        self.value = value
-        
-    def __str__(self):
-        return self.rank + " of " + self.color
-        
-    def __eq__(self, other):
-        return self.color == other.color and self.rank == other.rank
-
-def generate_deck(suits=["Hearts", "Spades", "Clubs", "Diamonds"], 
-                  ranks=[("2",2), ("3",3), ("4",4), ("5",5), ("6",6), ("7",7), ("8",8), ("9",9), ("10",10), ("Jack",10), ("Queen",10), ("King",10), ("Ace",11)]):
-    result = []
-    for suit in suits:
-        for (rank,value) in ranks:
-            result.append(Card(suit,rank,value))
-    return result
-    
-def format(cards):
-    if isinstance(cards, Card):
-        return str(cards)
-    return ", ".join(map(str, cards))
-    
-def get_value(cards):
-    """
-    Calculate the value of a set of cards. Aces may be counted as 11 or 1, to avoid going over 21
-    """
-    result = 0
-    aces = 0
-    for c in cards:
-        result += c.value
-        if c.rank == "Ace":
-            aces += 1
-    while result > 21 and aces > 0:
-        result -= 10
-        aces -= 1
-    return result
-    
-
-class PlayerType(IntEnum):
-    PLAYER = 1
-    DEALER = 2
-    
-class Action(IntEnum):
-    HIT = 1
-    STAND = 2
-    DOUBLE_DOWN = 3
-    SPLIT = 4
-
-class Player:
-    """
-    The basic player just chooses a random action
-    """
-    def __init__(self, name, deck):
-        self.name = name
-        self.deck = deck
-    def get_action(self, cards, actions, dealer_cards):
-        return random.choice(actions)
-    def reset(self):
-        pass
-        
-class TimidPlayer(Player):
-    """
-    The timid player always stands, and never takes additional cards.
-    """
-    def get_action(self, cards, actions, dealer_cards):
-        return Action.STAND
-        
-class BasicStrategyPlayer(Player):
-    """
-    Basic strategy: If the dealer has a card lower than a 7 open, we hit if we have less than 12. Otherwise, we hit if we have less than 17. The idea being: If the dealer has a low card open, they are more likely to bust, if they have a high card open they are more likely to stand with a high score that we need to beat.
-    """
-    def get_action(self, cards, actions, dealer_cards):
-        pval = get_value(cards)
-        if dealer_cards[0].value < 7:
-            if pval < 12:
-                return Action.HIT 
-            return Action.STAND 
-        if pval < 17:
-            return Action.HIT
-        return Action.STAND
-
-"""
-Represents a node in the MCTS tree which stores information
-about itself along with references to its parent/children.
-For the UCB1 formula I defined a constant CURIOSITY_FACTOR
-to alter the favorability of less explored nodes over
-those best known for higher overall values.
-"""
-CURIOSITY_FACTOR = 3.5
-class MCTSNode:
-    # No Arguments Implies Root Node
-    def __init__(self, action = None, parent = None):
-        self.parent = parent
-        self.action_path = []
-        if parent is not None and action is not None:
-            self.action_path = parent.action_path + [action]
-        self.children = []
-        self.total = 0
-        self.visits = 0
-    
-    # Returns The Expected Value Of The Node
-    def score(self):
-        return 0 if self.visits == 0 else self.total * 1.0 / self.visits
-
-    # Gets The Best Action By Its Expected Value
-    def best_action(self):
-        return max(self.children, key=lambda node:node.score()).action_path[-1]
-
-    # Given Total Number Of Iterations So Far
-    # Calculates UCB1 Result For This Node
-    # Assuming It Has Already Been Visted!
-    def ucb1(self, num_iterations):
-        if self.visits == 0:
-            return math.inf
-        return self.score() + CURIOSITY_FACTOR * (math.sqrt(math.log(num_iterations) / self.visits))
-
-    # Selects A Child Node For Expansion, Null If No Children
-    # Returns An Unvisited Node If Available Or Highest UCB1
-    def select_child(self, num_iterations):
-        max = None
-        max_ucb1 = None
-        for candidate in self.children:
-            if candidate.visits == 0:
-                return candidate
-            if max is None or candidate.ucb1(num_iterations) > max_ucb1:
-                max = candidate
-                max_ucb1 = candidate.ucb1(num_iterations)
-        return max
-
-    # Expand; Each Action Expands To One Child Node
-    def expand(self, actions):
-        for action in actions:
-            self.children.append(MCTSNode(action, self))
-
-    # Recursively Backpropogates Score AND Increment Node Visits
-    def backpropogate(self, value):
-        self.total += value
-        self.visits += 1
-        if (self.parent is not None):
-            self.parent.backpropogate(value)
-
-MCTS_N = 1000
-        
-class MCTSPlayer(Player):
-    """
-    This agent will run MCTS_N simulations.
-    For each simulation, the cards the player has not yet seen are shuffled and used as the assumed deck.
-    Then the `RolloutPlayer` plays MCTS_N games starting from that random shuffle.
-    The agent will give the `RolloutPlayer` an initial sequence of actions and let it
-        complete the game randomly, recording how many points where obtained for each rollout.
-    """
-    def __init__(self, name, deck):
-        self.name = name
-        self.bet = 2
-        self.deck = deck
-    def get_action(self, cards, actions, dealer_cards):
-        # Make a copy of the deck!
-        deck = self.deck[:]
-        
-        # Remove cards we have already seen (ours, and the open dealer card)
-        for p in cards:
-            deck.remove(p)
-        for p in dealer_cards:
-            deck.remove(p)
-        
-        # For each of our simulations we use the rollout player. 
-        # Our Rollout Player selects actions at random, and records what it did (!)
-        p = RolloutPlayer("Rollout", deck)
-        
-        # We create a new game object with the reduced deck, played by our rollout player
-        g1 = Game(deck, p, verbose=False)
-        
-        # Create Initial Node Corresponding To Current State
-        root = MCTSNode()
-        root.expand(actions)
-
-        for i in range(MCTS_N):
-            # Get The Next Best Node To Expand
-            selected = root.select_child(i + 1)
-            
-            # If Node Has Already Been Visited, Select Child
-            # Expand Node If Necessary
-            while selected.visits > 0:
-                next_selection = selected.select_child(i)
-                if next_selection is None:
-                    selected.expand(actions)
-                else:
-                    selected = next_selection
-
-            # The rollout player stores its action history, we reset this first
-            p.reset()
-
-            # Rollout After Following Initial Sequence Leading To Node
-            for action in selected.action_path:
-                p.queue_action(action)
-            
-            # continue_round allows us to pass a partial game state (which cards we have, what the open 
-            # card of the dealer is, and how much we've bet), and continue the game from there 
-            # i.e. the game will *not* deal us two new cards, but instead use the ones we already have 
-            # It will, however, then run as normal, calling `get_action` on the player object we passed earlier,
-            # which is our rollout_player
-            # The return value is the amount of money the agent won, across *all* hands (if they split)
-            res = g1.continue_round(cards, dealer_cards, self.bet)
-            
-            # Record the result for each possible action
-            selected.backpropogate(res)
-        
-        # Calculate the action with the highest *average* return
-        act = root.best_action()
-                
-        # Make sure we also record our own bet in case we double down (!)
-        if act == Action.DOUBLE_DOWN:
-            self.bet *= 2
-        return act
-    def reset(self):
-        self.bet = 2
-        
-class RolloutPlayer(Player):
-    """
-    Used by the MCTS Player to perform rollouts: play randomly and record actions
-    """
-    def __init__(self, name, deck):
-        self.name = name
-        self.actions = []
-        self.deck = deck
-        self.queued_actions = []
-    # Allow Initial Action Before Random Rollout
-    def queue_action(self, action):
-        self.queued_actions.append(action)
-    def get_action(self, cards, actions, dealer_cards):
-        # Next Queued Action Or Random If None
-        act = self.queued_actions.pop(0) if len(self.queued_actions) > 0 else random.choice(actions)
-        self.actions.append(act)
-        return act
-    def reset(self):
-        self.actions = []
-        self.queued_actions = []
-        
-class ConsolePlayer(Player):
-    def get_action(self, cards, actions, dealer_cards):
-        print()
-        print("  Your cards:", format(cards), "(%.1f points)"%get_value(cards))
-        print("  Dealer's visible card:", format(dealer_cards), "(%.1f points)"%get_value(dealer_cards))
-        while True:
-            print("  Which action do you want to take?")
-            for i, a in enumerate(actions):
-                print(" ", i+1, a.name)
-            x = input()
-            try:
-                x = int(x)
-                return actions[x-1]
-            except Exception:
-                print(" >>> Please enter a valid action number <<<")
-    def reset(self):
-        pass
-        
-class Dealer(Player):
-    """
-    The dealer has a fixed strategy: Hit when he has fewer than 17 points, otherwise stand.
-    """
-    def __init__(self):
-        self.name = "Dealer"
-    def get_action(self, cards, actions, dealer_cards):
-        if get_value(cards) < 17:
-            return Action.HIT
-        return Action.STAND
-        
-def same_rank(a, b):
-    return a.rank == b.rank
-    
-def same_value(a, b):
-    return a.value == b.value
-
-class Game:
-    def __init__(self, cards, player, split_rule=same_value, verbose=True):
-        self.cards = cards 
-        self.player = player
-        self.dealer = Dealer()
-        self.dealer_cards = []
-        self.player_cards = []
-        self.split_cards = []
-        self.verbose = verbose
-        self.split_rule = split_rule
-
-    def round(self):
-        """
-        Play one round of black jack. First, the player is asked to take actions until they
-        either stand or have more than 21 points. The return value of this function is the 
-        amount of money the player won.
-        """
-        self.deck = self.cards[:]
-        random.shuffle(self.deck)
-        self.dealer_cards = []
-        self.player_cards = []
-        self.bet = 2
-        self.player.reset()
-        self.dealer.reset()
-        for i in range(2):
-            self.deal(self.player_cards, self.player.name)
-            self.deal(self.dealer_cards, self.dealer.name, i < 1)
-        return self.play_round()
-        
-        
-    def continue_round(self, player_cards, dealer_cards, bet):
-        """
-        Like round, but allows passing an initial game state in order to finish a partially played game.
-       
-        player_cards are the cards the player has in their hand
-        dealer_cards are the visible cards (typically 1) of the dealer 
-        bet is the current bet of the player 
-        
-        Note: For best results create a *new* Game object with a deck that has player_cards and dealer_cards removed.
-        """
-        self.deck = self.cards[:]
-        random.shuffle(self.deck)
-        self.bet = bet
-        self.player_cards = player_cards[:] 
-        self.dealer_cards = dealer_cards[:]
-        while len(self.dealer_cards) < 2:
-            self.deal(self.dealer_cards, self.dealer.name)
-        return self.play_round()
-        
-    def play_round(self):
-        """
-        Function used to actually play a round of blackjack after the initial setup done in round or continue_round.
-        
-        Will first let the player take their actions and then proceed with the dealer.
-        """
-        cards = self.play(self.player, self.player_cards)
-        if self.verbose:
-            print("Dealer reveals: ", format(self.dealer_cards[-1]))
-            print("Dealer has:", format(self.dealer_cards), "(%.1f points)"%get_value(self.dealer_cards))
-        self.play(self.dealer, self.dealer_cards)
-        reward = sum(self.reward(c) for c in cards)
-        if self.verbose:
-            print("Bet:", self.bet, "won:", reward, "\n")
-        return reward
-
-    def deal(self, cards, name, public=True):
-        """
-        Deal the next card to the given hand
-        """
-        card = self.deck[0]
-        if self.verbose and public: 
-            print(name, "draws", format(card))
-        self.deck = self.deck[1:]
-        cards.append(card)
-
-    def play(self, player, cards, cansplit=True, postfix=""):
-        """
-        Play a round of blackjack for *one* participant (player or dealer).
-        
-        Note that a player may only split once, and only if the split_rule is satisfied (either two cards of the same rank, or of the same value)
-        """
-        while get_value(cards) < 21:
-            actions = [Action.HIT, Action.STAND, Action.DOUBLE_DOWN]
-            if len(cards) == 2 and cansplit and self.split_rule(cards[0], cards[1]):
-                actions.append(Action.SPLIT)
-            act = player.get_action(cards, actions, self.dealer_cards[:1])
-            if act in actions:
-                if self.verbose:
-                    print(player.name, "does", act.name)
-                if act == Action.STAND:
-                    break
-                if act == Action.HIT or act == Action.DOUBLE_DOWN:
-                    self.deal(cards, player.name)
-                if act == Action.DOUBLE_DOWN:
-                    self.bet *= 2
-                    break
-                if act == Action.SPLIT:
-                    pilea = cards[:1]
-                    pileb = cards[1:]
-                    if self.verbose:
-                        print(player.name, "now has 2 hands")
-                        print("Hand 1:", format(pilea))
-                        print("Hand 2:", format(pileb))
-                    self.play(player, pilea, False, " (hand 1)")
-                    self.play(player, pileb, False, " (hand 2)")
-                    return [pilea, pileb]
-        if self.verbose:
-            print(player.name, "ends with%s"%(postfix), format(cards), "with value", get_value(cards), "\n")
-        return [cards]
-
-    def reward(self, player_cards):
-        """
-        Calculate amount of money won by the player. Blackjack pays 3:2.
-        """
-        pscore = get_value(player_cards)
-        dscore = get_value(self.dealer_cards)
-        if self.verbose:
-            print(self.player.name + ":", format(player_cards), "(%.1f points)"%(pscore))
-            print(self.dealer.name + ":", format(self.dealer_cards), "(%.1f points)"%(dscore))
-        
-        if pscore > 21:
-            return -self.bet
-        result = -self.bet
-        if pscore > dscore or dscore > 21:
-            if pscore == 21 and len(self.player_cards) == 2:
-                result = 3*self.bet/2
-            result = self.bet
-        if pscore == dscore and (pscore != 21 or len(self.player_cards) != 2):
-            result = 0
-        return result
-        
-        
-player_types = {"default": Player, "timid": TimidPlayer, "basic": BasicStrategyPlayer, "mcts": MCTSPlayer, "console": ConsolePlayer}
-
-# Our implementation allows us to define different deck "types", such as only even cards, 
-# or even use made-up card values like "1.5"
-
-deck_types = {"default": generate_deck(), 
-              "high": generate_deck(ranks=[("2", 2), ("10", 10), ("Ace", 11), ("Fool", 12)]),
-              "low": generate_deck(ranks=[("1.5", 1.5), ("2", 2),("2.2", 2.2), ("3", 3), ("3", 4), ("Ace", 11)], suits=["Hearts", "Spades", "Clubs", "Diamonds", "Swords", "Wands", "Bows"]),
-              "even": generate_deck(ranks=[("2",2), ("4",4), ("6",6), ("8",8), ("10",10), ("Jack",10), ("Queen",10), ("King",10)]),
-              "odd": generate_deck(ranks=[("3",3), ("5",5), ("7",7), ("9",9), ("Ace",11)]),
-              "red": generate_deck(suits=["Diamonds", "Hearts"]),
-              "random": generate_deck(ranks=random.sample([("2",2), ("3",3), ("4",4), ("5",5), ("6",6), ("7",7), ("8",8), ("9",9), ("10",10), ("Jack",10), ("Queen",10), ("King",10), ("Ace",11)], random.randint(5,13)))}
-
-def main(ptype="default", dtype="default", n=100, split_rule=same_value, verbose=True):
-    deck = deck_types[dtype]
-    g = Game(deck, player_types[ptype]("Sir Gladington III, Esq.", deck[:]), split_rule, verbose)
-    points = []
-    for i in range(n):
-        points.append(g.round())
-    print("Average points: ", sum(points)*1.0/n)
-    
-
-# run `python blackjack.py --help` for usage information
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Run a simulation of a Blackjack agent.')
-    parser.add_argument('player', nargs="?", default="default", 
-                        help='the player type (available values: %s)'%(", ".join(player_types.keys())))
-    parser.add_argument('-n', '--count', dest='count', action='store', default=100,
-                        help='How many games to run')
-    parser.add_argument('-s', '-q', '--silent', '--quiet', dest='verbose', action='store_const', default=True, const=False,
-                        help='Do not print game output (only average score at the end is printed)')
-    parser.add_argument('-r', '--rank', '--rank-split', dest='split', action='store_const', default=same_value, const=same_rank,
-                        help="Only allow split when the player's cards have the same rank (default: allow split when they have the same value)")
-    parser.add_argument('-d', "--deck", metavar='D', dest="deck", nargs=1, default=["default"], 
-                        help='the deck type to use (available values: %s)'%(", ".join(deck_types.keys())))
-    args = parser.parse_args()
-    if args.player not in player_types:
-        print("Invalid player type: %s. Available options are: \n%s"%(args.player, ", ".join(player_types.keys())))
-        sys.exit(-1)
-    if args.deck[0] not in deck_types:
-        print("Invalid deck type: %s. Available options are: \n%s"%(args.deck, ", ".join(deck_types.keys())))
-        sys.exit(-1)
+import random
+from collections import namedtuple
+from enum import IntEnum
+import multiprocessing
+import sys
+import argparse
+import math
+
+import numpy as np
+
+# Numba is optional: when available the MCTS rollouts run through a compiled
+# kernel, otherwise the vectorized NumPy implementation is used.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+class Card(namedtuple("Card", ["color", "rank", "value"])):
+    """
+    A card only matters for its integer value (and whether it is an Ace); the rank and
+    suit strings are kept for display. As a namedtuple it is immutable and compact,
+    with C-level attribute access and comparison.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return self.rank + " of " + self.color
+
+def generate_deck(suits=["Hearts", "Spades", "Clubs", "Diamonds"], 
+                  ranks=[("2",2), ("3",3), ("4",4), ("5",5), ("6",6), ("7",7), ("8",8), ("9",9), ("10",10), ("Jack",10), ("Queen",10), ("King",10), ("Ace",11)]):
+    result = []
+    for suit in suits:
+        for (rank,value) in ranks:
+            result.append(Card(suit,rank,value))
+    return result
+    
+def format(cards):
+    if isinstance(cards, Card):
+        return str(cards)
+    return ", ".join(map(str, cards))
+    
+def soft_value(total, aces):
+    """
+    Calculate the value of a hand from its raw total and ace count. Aces may be
+    counted as 11 or 1, to avoid going over 21
+    """
+    while total > 21 and aces > 0:
+        total -= 10
+        aces -= 1
+    return total
+
+def get_value(cards):
+    """
+    Calculate the value of a set of cards. Aces may be counted as 11 or 1, to avoid going over 21
+    """
+    result = 0
+    aces = 0
+    for c in cards:
+        result += c.value
+        if c.rank == "Ace":
+            aces += 1
+    return soft_value(result, aces)
+
+
+class PlayerType(IntEnum):
+    PLAYER = 1
+    DEALER = 2
+    
+class Action(IntEnum):
+    HIT = 1
+    STAND = 2
+    DOUBLE_DOWN = 3
+    SPLIT = 4
+
+# Plain int versions of the Action members for hot-path comparisons; comparing
+# against a loaded enum attribute costs two global/attribute loads per branch.
+_HIT = int(Action.HIT)
+_STAND = int(Action.STAND)
+_DOUBLE_DOWN = int(Action.DOUBLE_DOWN)
+_SPLIT = int(Action.SPLIT)
+
+# Canonical action tuples offered to get_action, hoisted so Game.play does not
+# rebuild the list of legal actions on every player turn.
+_BASE_ACTIONS = (Action.HIT, Action.STAND, Action.DOUBLE_DOWN)
+_SPLIT_ACTIONS = _BASE_ACTIONS + (Action.SPLIT,)
+
+class Player:
+    """
+    The basic player just chooses a random action
+    """
+    def __init__(self, name, deck):
+        self.name = name
+        self.deck = deck
+        # Dedicated generator: no shared global Mersenne Twister state, and
+        # randrange on an index skips random.choice's extra layers.
+        self._rng = random.Random()
+    def get_action(self, cards, actions, dealer_cards):
+        return actions[self._rng.randrange(len(actions))]
+    def reset(self):
+        pass
+        
+class TimidPlayer(Player):
+    """
+    The timid player always stands, and never takes additional cards.
+    """
+    def get_action(self, cards, actions, dealer_cards):
+        return Action.STAND
+        
+class BasicStrategyPlayer(Player):
+    """
+    Basic strategy: If the dealer has a card lower than a 7 open, we hit if we have less than 12. Otherwise, we hit if we have less than 17. The idea being: If the dealer has a low card open, they are more likely to bust, if they have a high card open they are more likely to stand with a high score that we need to beat.
+    """
+    def get_action(self, cards, actions, dealer_cards):
+        pval = get_value(cards)
+        if dealer_cards[0].value < 7:
+            if pval < 12:
+                return Action.HIT
+            return Action.STAND
+        if pval < 17:
+            return Action.HIT
+        return Action.STAND
+    def get_action_fast(self, value, dealer_up):
+        """
+        Same strategy given the precomputed hand value; no rescan of the cards.
+        """
+        if dealer_up < 7:
+            return _HIT if value < 12 else _STAND
+        return _HIT if value < 17 else _STAND
+
+"""
+Represents the MCTS tree as parallel arrays indexed by node id instead
+of one Python object per node: parent, action, total, visits and the
+child slice bounds each live in their own array (structure of arrays).
+Children of a node are stored contiguously, so selection is an argmax
+over a slice. Node 0 is the root.
+For the UCB1 formula I defined a constant CURIOSITY_FACTOR
+to alter the favorability of less explored nodes over
+those best known for higher overall values.
+"""
+CURIOSITY_FACTOR = 3.5
+class MCTSTree:
+    def __init__(self, capacity=512):
+        self.capacity = capacity
+        self.parent = np.full(capacity, -1, dtype=np.int32)
+        self.action = np.zeros(capacity, dtype=np.int8)
+        self.total = np.zeros(capacity, dtype=np.float64)
+        self.visits = np.zeros(capacity, dtype=np.int64)
+        self.child_start = np.zeros(capacity, dtype=np.int32)
+        self.n_children = np.zeros(capacity, dtype=np.int8)
+        # Mean Score total/visits, Updated At Backpropogation
+        # So Selection Never Divides
+        self.score = np.zeros(capacity, dtype=np.float64)
+        # Node 0 Is The Root
+        self.n_nodes = 1
+
+    # Doubles The Arrays Whenever Expansion Runs Out Of Room
+    def _grow(self):
+        self.capacity *= 2
+        for name in ("parent", "action", "total", "visits", "child_start", "n_children", "score"):
+            old = getattr(self, name)
+            grown = np.full(self.capacity, -1 if name == "parent" else 0, dtype=old.dtype)
+            grown[:len(old)] = old
+            setattr(self, name, grown)
+
+    # Expand; Each Action Expands To One Child Node
+    def expand(self, node, actions):
+        while self.n_nodes + len(actions) > self.capacity:
+            self._grow()
+        start = self.n_nodes
+        self.child_start[node] = start
+        self.n_children[node] = len(actions)
+        for i, action in enumerate(actions):
+            self.parent[start + i] = node
+            self.action[start + i] = int(action)
+        self.n_nodes += len(actions)
+
+    # Selects A Child Node For Expansion, -1 If No Children
+    # Returns An Unvisited Node If Available Or Highest UCB1
+    def select_child(self, node, num_iterations):
+        k = self.n_children[node]
+        if k == 0:
+            return -1
+        start = self.child_start[node]
+        visits = self.visits[start:start + k]
+        unvisited = visits == 0
+        if unvisited.any():
+            return start + int(np.argmax(unvisited))
+        ucb1 = self.score[start:start + k] + CURIOSITY_FACTOR * np.sqrt(math.log(num_iterations) / visits)
+        return start + int(np.argmax(ucb1))
+
+    # Backpropogates Score AND Increment Node Visits
+    # Iterates Up The Parent Indices, No Pointer Chasing
+    def backpropogate(self, node, value, visits=1):
+        while node >= 0:
+            self.total[node] += value
+            self.visits[node] += visits
+            self.score[node] = self.total[node] / self.visits[node]
+            node = self.parent[node]
+
+    # Re-Roots The Tree At The Root's Child Matching The Given
+    # Action, Keeping The Subtree's Accumulated Statistics
+    # Returns The New Tree, None If No Visited Child Matches
+    def reroot(self, action):
+        start = self.child_start[0]
+        for child in range(start, start + self.n_children[0]):
+            if self.action[child] == action and self.visits[child] > 0:
+                break
+        else:
+            return None
+        new = MCTSTree(self.capacity)
+        new.total[0] = self.total[child]
+        new.visits[0] = self.visits[child]
+        new.score[0] = self.score[child]
+        # Copy the subtree level by level, remapping node ids; children stay
+        # contiguous so the copied slices keep the layout invariant.
+        pending = [(child, 0)]
+        while pending:
+            old_node, new_node = pending.pop()
+            k = int(self.n_children[old_node])
+            if k == 0:
+                continue
+            old_start = int(self.child_start[old_node])
+            while new.n_nodes + k > new.capacity:
+                new._grow()
+            start = new.n_nodes
+            new.child_start[new_node] = start
+            new.n_children[new_node] = k
+            for i in range(k):
+                new.parent[start + i] = new_node
+                new.action[start + i] = self.action[old_start + i]
+                new.total[start + i] = self.total[old_start + i]
+                new.visits[start + i] = self.visits[old_start + i]
+                new.score[start + i] = self.score[old_start + i]
+                pending.append((old_start + i, start + i))
+            new.n_nodes += k
+        return new
+
+    # Rebuilds The Action Sequence Leading To A Node By
+    # Walking Its Parents; Paths Are Not Stored Per Node
+    # Fills A Preallocated Array Back To Front, No Reversal
+    def action_path(self, node):
+        depth = 0
+        n = node
+        while n > 0:
+            depth += 1
+            n = self.parent[n]
+        path = np.empty(depth, dtype=np.int64)
+        for i in range(depth - 1, -1, -1):
+            path[i] = self.action[node]
+            node = self.parent[node]
+        return path
+
+MCTS_N = 1000
+
+# How many rollouts to run (as one NumPy batch) each time a leaf is selected.
+# The MCTS_N budget is spent in batches of this size.
+ROLLOUT_BATCH = 25
+
+def _soft_values(totals, aces):
+    """
+    Vectorized version of the ace-softening loop in get_value: given arrays of raw
+    hand totals and ace counts, count aces as 1 instead of 11 while the total is over 21.
+    """
+    totals = totals.copy()
+    aces = aces.copy()
+    over = (totals > 21) & (aces > 0)
+    while over.any():
+        totals[over] -= 10
+        aces[over] -= 1
+        over = (totals > 21) & (aces > 0)
+    return totals
+
+def _batch_rollout(rng, deck_values, deck_aces, player_values, player_aces, dealer_value, dealer_ace, action_path, bet, batch):
+    """
+    Simulate `batch` rollouts at once with NumPy instead of playing `batch` separate
+    games through Game.continue_round. Each rollout draws from an independently
+    permuted copy of the unseen deck, applies the queued `action_path` first (exactly
+    like RolloutPlayer), then plays the remaining player turns uniformly at random
+    and finishes with the fixed dealer policy. Returns the per-rollout rewards.
+
+    deck_values/deck_aces describe the unseen cards; player_values/player_aces the
+    cards already in the player's hand; dealer_value/dealer_ace the dealer's open card.
+    """
+    n = len(deck_values)
+    sum_dtype = np.int32 if np.issubdtype(deck_values.dtype, np.integer) else np.float64
+    # One permutation of the unseen deck per rollout; permute indices so the
+    # ace flags stay aligned with the card values.
+    perm = rng.permuted(np.broadcast_to(np.arange(n), (batch, n)), axis=1)
+    decks = deck_values[perm]
+    aces = deck_aces[perm]
+
+    # Per-rollout player state. Column 0 of each deck is the dealer's hole card,
+    # matching continue_round dealing it before the player acts.
+    cur_sum = np.full(batch, player_values.sum(), dtype=sum_dtype)
+    cur_aces = np.full(batch, int(player_aces.sum()), dtype=np.int32)
+    cur_n = np.full(batch, len(player_values), dtype=np.int32)
+    pos = np.ones(batch, dtype=np.int32)
+    qi = np.zeros(batch, dtype=np.int32)
+    bet_mult = np.ones(batch, dtype=np.int32)
+    split = np.zeros(batch, dtype=bool)
+    on_second_hand = np.zeros(batch, dtype=bool)
+    first_hand_score = np.zeros(batch, dtype=sum_dtype)
+    active = _soft_values(cur_sum, cur_aces) < 21
+
+    path = np.array([int(a) for a in action_path], dtype=np.int32)
+    # Random continuations only ever see HIT/STAND/DOUBLE_DOWN: a split is only
+    # legal on the original two-card hand, whose first action always comes from
+    # the queued path, so SPLIT can only enter a rollout through `path`.
+    random_actions = np.array([_HIT, _STAND, _DOUBLE_DOWN], dtype=np.int32)
+
+    while active.any():
+        # A split is only offered for the untouched original hand when its two cards share a value.
+        can_split = (active & ~split & ~on_second_hand & (cur_n == 2)
+                     & (len(player_values) == 2) & (player_values[0] == player_values[-1]))
+        queued = qi < len(path)
+        acts = np.where(queued & active,
+                        path[np.minimum(qi, len(path) - 1)],
+                        random_actions[rng.integers(0, 3, batch)])
+        qi[active] += 1
+
+        m_split = active & (acts == _SPLIT) & can_split
+        m_hit = active & ((acts == _HIT) | (acts == _DOUBLE_DOWN))
+        m_dd = active & (acts == _DOUBLE_DOWN)
+        m_stand = active & (acts == _STAND)
+
+        # Split: the current hand becomes just the first original card; the second
+        # card seeds the second hand once the first one finishes.
+        cur_sum[m_split] = player_values[0]
+        cur_aces[m_split] = int(player_aces[0])
+        cur_n[m_split] = 1
+        split |= m_split
+
+        rows = np.nonzero(m_hit)[0]
+        cur_sum[rows] += decks[rows, pos[rows]]
+        cur_aces[rows] += aces[rows, pos[rows]]
+        cur_n[rows] += 1
+        pos[rows] += 1
+        bet_mult[m_dd] *= 2
+
+        values = _soft_values(cur_sum, cur_aces)
+        finished = active & (m_stand | m_dd | (values >= 21))
+        # A finished first hand of a split hands play over to the second hand.
+        to_second = finished & split & ~on_second_hand
+        first_hand_score[to_second] = values[to_second]
+        on_second_hand |= to_second
+        cur_sum[to_second] = player_values[-1]
+        cur_aces[to_second] = int(player_aces[-1])
+        cur_n[to_second] = 1
+        active &= ~(finished & ~to_second)
+
+    # Dealer takes the hole card and hits on anything below 17.
+    dealer_sum = np.full(batch, dealer_value, dtype=sum_dtype) + decks[:, 0]
+    dealer_aces = np.full(batch, int(dealer_ace), dtype=np.int32) + aces[:, 0]
+    while True:
+        hitting = _soft_values(dealer_sum, dealer_aces) < 17
+        if not hitting.any():
+            break
+        rows = np.nonzero(hitting)[0]
+        dealer_sum[rows] += decks[rows, pos[rows]]
+        dealer_aces[rows] += aces[rows, pos[rows]]
+        pos[rows] += 1
+
+    dealer_score = _soft_values(dealer_sum, dealer_aces)
+    bets = bet * bet_mult
+
+    def hand_reward(score, natural):
+        # Mirrors Game.reward: bust loses, beating the dealer (or a dealer bust)
+        # wins, and a push returns the bet unless the hand is a two-card 21.
+        result = np.where((score > dealer_score) | (dealer_score > 21), bets, -bets)
+        result = np.where((score == dealer_score) & ~natural, 0, result)
+        return np.where(score > 21, -bets, result)
+
+    final_score = _soft_values(cur_sum, cur_aces)
+    single = hand_reward(final_score, (final_score == 21) & (cur_n == 2))
+    # After a split the original hand still has two cards, so Game.reward treats
+    # any 21 in either pile as a two-card 21.
+    split_total = hand_reward(first_hand_score, first_hand_score == 21) + hand_reward(final_score, final_score == 21)
+    return np.where(split, split_total, single)
+
+if njit is not None:
+    @njit(cache=True)
+    def _soften(total, aces):
+        while total > 21 and aces > 0:
+            total -= 10
+            aces -= 1
+        return total
+
+    @njit(cache=True)
+    def _hand_reward(score, natural, dealer_score, bet):
+        if score > 21:
+            return -bet
+        if score > dealer_score or dealer_score > 21:
+            return bet
+        if score == dealer_score and not natural:
+            return 0.0
+        return -bet
+
+    @njit(cache=True)
+    def _rollout_kernel(deck_values, deck_aces, player_values, player_aces, dealer_value, dealer_ace, path, bet, batch, seed):
+        """
+        Compiled rollout loop with the same semantics as _batch_rollout (the two must
+        be kept in sync): apply the queued action path, finish the player's turns with
+        uniformly random hit/stand/double, dealer hits below 17, rewards as in
+        Game.reward. Action codes follow the Action enum (1 hit, 2 stand, 3 double
+        down, 4 split). Draws use partial Fisher-Yates over a reusable index array.
+        """
+        np.random.seed(seed)
+        n = deck_values.shape[0]
+        rewards = np.empty(batch, np.float64)
+        order = np.empty(n, np.int64)
+        p_sum0 = player_values.sum()
+        p_aces0 = player_aces.sum()
+        p_n0 = player_values.shape[0]
+        for b in range(batch):
+            for i in range(n):
+                order[i] = i
+            # Dealer hole card comes off the deck first, like continue_round.
+            j = np.random.randint(0, n)
+            order[0], order[j] = order[j], order[0]
+            hole = order[0]
+            pos = 1
+
+            cur_sum = p_sum0
+            cur_aces = p_aces0
+            cur_n = p_n0
+            qi = 0
+            bet_mult = 1
+            split = False
+            on_second = False
+            first_score = 0.0
+            while True:
+                value = _soften(cur_sum, cur_aces)
+                ended = value >= 21
+                if not ended:
+                    if qi < path.shape[0]:
+                        act = path[qi]
+                        qi += 1
+                    else:
+                        act = _HIT + np.random.randint(0, 3)
+                    if act == _SPLIT:
+                        # Only the untouched original two-card hand may split.
+                        if (not split) and (not on_second) and cur_n == 2 and p_n0 == 2 and player_values[0] == player_values[-1]:
+                            split = True
+                            cur_sum = player_values[0]
+                            cur_aces = 1 if player_aces[0] else 0
+                            cur_n = 1
+                        continue
+                    if act == _HIT or act == _DOUBLE_DOWN:
+                        j = np.random.randint(pos, n)
+                        order[pos], order[j] = order[j], order[pos]
+                        card = order[pos]
+                        pos += 1
+                        cur_sum += deck_values[card]
+                        if deck_aces[card]:
+                            cur_aces += 1
+                        cur_n += 1
+                    if act == _DOUBLE_DOWN:
+                        bet_mult *= 2
+                        ended = True
+                    elif act == _STAND:
+                        ended = True
+                    else:
+                        continue
+                    value = _soften(cur_sum, cur_aces)
+                if split and not on_second:
+                    # First pile of the split is done; play the second one.
+                    first_score = value
+                    on_second = True
+                    cur_sum = player_values[-1]
+                    cur_aces = 1 if player_aces[-1] else 0
+                    cur_n = 1
+                    continue
+                break
+
+            dealer_sum = dealer_value + deck_values[hole]
+            dealer_aces = (1 if dealer_ace else 0) + (1 if deck_aces[hole] else 0)
+            while _soften(dealer_sum, dealer_aces) < 17:
+                j = np.random.randint(pos, n)
+                order[pos], order[j] = order[j], order[pos]
+                card = order[pos]
+                pos += 1
+                dealer_sum += deck_values[card]
+                if deck_aces[card]:
+                    dealer_aces += 1
+            dealer_score = _soften(dealer_sum, dealer_aces)
+
+            bets = bet * bet_mult
+            final_score = _soften(cur_sum, cur_aces)
+            if split:
+                rewards[b] = (_hand_reward(first_score, first_score == 21, dealer_score, bets)
+                              + _hand_reward(final_score, final_score == 21, dealer_score, bets))
+            else:
+                rewards[b] = _hand_reward(final_score, final_score == 21 and cur_n == 2, dealer_score, bets)
+        return rewards
+else:
+    _rollout_kernel = None
+
+def _mcts_search(deck_values, deck_aces, player_values, player_aces, dealer_value, dealer_ace, actions, bet, n_rollouts, rng, tree=None):
+    """
+    Run one independent MCTS search until the tree holds n_rollouts rollouts and return
+    the statistics of the root's children as {action: (total, visits)}. This is the unit
+    of work for root parallelization: each worker builds its own private tree from its
+    own seed, and only the root statistics travel back to be merged. rng may be a
+    Generator or a seed. A tree carried over from an earlier decision may be passed in;
+    its existing rollouts count against the budget.
+    """
+    rng = np.random.default_rng(rng)
+
+    # Create Initial Tree; The Root (Node 0) Corresponds To The Current State
+    if tree is None:
+        tree = MCTSTree()
+    if tree.n_children[0] == 0:
+        tree.expand(0, actions)
+
+    while tree.visits[0] < n_rollouts:
+        # Get The Next Best Node To Expand
+        selected = tree.select_child(0, tree.visits[0] + 1)
+
+        # If Node Has Already Been Visited, Select Child
+        # Expand Node If Necessary
+        while tree.visits[selected] > 0:
+            next_selection = tree.select_child(selected, tree.visits[0])
+            if next_selection < 0:
+                tree.expand(selected, actions)
+            else:
+                selected = next_selection
+
+        # Rollout A Whole Batch After Following Initial Sequence Leading To Node
+        action_path = tree.action_path(selected)
+        if _rollout_kernel is not None:
+            rewards = _rollout_kernel(deck_values, deck_aces, player_values, player_aces,
+                                      dealer_value, bool(dealer_ace), action_path,
+                                      bet, ROLLOUT_BATCH, int(rng.integers(1 << 31)))
+        else:
+            rewards = _batch_rollout(rng, deck_values, deck_aces, player_values, player_aces,
+                                     dealer_value, dealer_ace, action_path, bet, ROLLOUT_BATCH)
+
+        # Record the batched results for each possible action
+        tree.backpropogate(selected, rewards.sum(), len(rewards))
+
+    start = tree.child_start[0]
+    return {Action(tree.action[child]): (float(tree.total[child]), int(tree.visits[child]))
+            for child in range(start, start + tree.n_children[0])}
+
+class MCTSPlayer(Player):
+    """
+    This agent will run MCTS_N simulations.
+    For each simulation, the cards the player has not yet seen are shuffled and used as the assumed deck.
+    The simulations are run in NumPy batches of ROLLOUT_BATCH: each time a leaf node is
+        selected, `_batch_rollout` follows the leaf's initial action sequence and then
+        completes a whole batch of games randomly, recording how many points were
+        obtained for each rollout.
+    With workers > 1 the MCTS_N budget is split across a process pool; each worker runs
+        its own search and the per-action root statistics are merged (root parallelization).
+    """
+    def __init__(self, name, deck, workers=1):
+        self.name = name
+        self.bet = 2
+        self.deck = deck
+        self.workers = workers
+        self._pool = None
+        self._rng = np.random.default_rng()
+        # Full-deck arrays and card positions, built once on the first decision
+        # and reused; per call only a boolean unseen mask is constructed.
+        self._deck_values = None
+        self._deck_aces = None
+        self._card_slots = None
+        # Search tree and action taken at the previous decision of this round,
+        # kept so the chosen subtree's statistics can be reused (tree reuse).
+        self._tree = None
+        self._last_action = None
+    def get_action(self, cards, actions, dealer_cards):
+        if self._deck_values is None:
+            values = np.array([c.value for c in self.deck])
+            if np.issubdtype(values.dtype, np.integer):
+                values = values.astype(np.int8)
+            self._deck_values = values
+            self._deck_aces = np.array([c.rank == "Ace" for c in self.deck])
+            self._card_slots = {}
+            for i, c in enumerate(self.deck):
+                self._card_slots.setdefault(c, []).append(i)
+
+        # Mask out cards we have already seen (ours, and the open dealer card)
+        # instead of copying the deck and removing Card objects one by one.
+        unseen = np.ones(len(self.deck), dtype=bool)
+        for c in (*cards, *dealer_cards):
+            for i in self._card_slots[c]:
+                if unseen[i]:
+                    unseen[i] = False
+                    break
+
+        # The unseen deck and both visible hands as plain value/ace arrays; the
+        # rollouts only ever look at card values, never the full Card objects.
+        deck_values = self._deck_values[unseen]
+        deck_aces = self._deck_aces[unseen]
+        player_values = np.array([c.value for c in cards])
+        player_aces = np.array([c.rank == "Ace" for c in cards])
+        dealer_value = dealer_cards[0].value
+        dealer_ace = dealer_cards[0].rank == "Ace"
+
+        if self.workers > 1:
+            # The pool is created once and reused, so the workers are only forked
+            # (spawned) on the first decision, not on every call.
+            if self._pool is None:
+                self._pool = multiprocessing.get_context("spawn").Pool(self.workers)
+            per_worker = -(-MCTS_N // self.workers)
+            jobs = [(deck_values, deck_aces, player_values, player_aces, dealer_value,
+                     dealer_ace, actions, self.bet, per_worker, int(seed))
+                    for seed in self._rng.integers(0, 2**63 - 1, size=self.workers)]
+            stats = {}
+            for result in self._pool.starmap(_mcts_search, jobs):
+                for action, (total, visits) in result.items():
+                    old_total, old_visits = stats.get(action, (0, 0))
+                    stats[action] = (old_total + total, old_visits + visits)
+        else:
+            # Reuse the subtree under the action we took at the previous decision
+            # of this round: its rollouts already explored the continuations, so
+            # only the remaining MCTS_N budget is spent on new simulations.
+            tree = None
+            if self._tree is not None and self._last_action is not None:
+                tree = self._tree.reroot(self._last_action)
+            if tree is None:
+                tree = MCTSTree()
+            stats = _mcts_search(deck_values, deck_aces, player_values, player_aces,
+                                 dealer_value, dealer_ace, actions, self.bet, MCTS_N,
+                                 self._rng, tree)
+            self._tree = tree
+
+        # Calculate the action with the highest *average* return
+        act = max(stats, key=lambda a: stats[a][0] / stats[a][1] if stats[a][1] else 0)
+        self._last_action = int(act)
+
+        # Make sure we also record our own bet in case we double down (!)
+        if act == Action.DOUBLE_DOWN:
+            self.bet *= 2
+        return act
+    def reset(self):
+        self.bet = 2
+        self._tree = None
+        self._last_action = None
+        
+class RolloutPlayer(Player):
+    """
+    Used by the MCTS Player to perform rollouts: play randomly and record actions
+    """
+    def __init__(self, name, deck):
+        self.name = name
+        self.actions = []
+        self.deck = deck
+        self.queued_actions = []
+        self._rng = random.Random()
+    # Allow Initial Action Before Random Rollout
+    def queue_action(self, action):
+        self.queued_actions.append(action)
+    def get_action(self, cards, actions, dealer_cards):
+        # Next Queued Action Or Random If None
+        act = self.queued_actions.pop(0) if len(self.queued_actions) > 0 else actions[self._rng.randrange(len(actions))]
+        self.actions.append(act)
+        return act
+    def reset(self):
+        self.actions = []
+        self.queued_actions = []
+        
+class ConsolePlayer(Player):
+    def get_action(self, cards, actions, dealer_cards):
+        print()
+        print("  Your cards:", format(cards), "(%.1f points)"%get_value(cards))
+        print("  Dealer's visible card:", format(dealer_cards), "(%.1f points)"%get_value(dealer_cards))
+        while True:
+            print("  Which action do you want to take?")
+            for i, a in enumerate(actions):
+                print(" ", i+1, a.name)
+            x = input()
+            try:
+                x = int(x)
+                return actions[x-1]
+            except Exception:
+                print(" >>> Please enter a valid action number <<<")
+    def reset(self):
+        pass
+        
+class Dealer(Player):
+    """
+    The dealer has a fixed strategy: Hit when he has fewer than 17 points, otherwise stand.
+    """
+    def __init__(self):
+        self.name = "Dealer"
+    def get_action(self, cards, actions, dealer_cards):
+        if get_value(cards) < 17:
+            return Action.HIT
+        return Action.STAND
+    def get_action_fast(self, value, dealer_up):
+        """
+        Same fixed strategy given the precomputed hand value; no rescan of the cards.
+        """
+        return _HIT if value < 17 else _STAND
+        
+def same_rank(a, b):
+    return a.rank == b.rank
+    
+def same_value(a, b):
+    return a.value == b.value
+
+class Game:
+    def __init__(self, cards, player, split_rule=same_value, verbose=True):
+        self.cards = cards
+        self.player = player
+        self.dealer = Dealer()
+        self.dealer_cards = []
+        self.player_cards = []
+        self.split_cards = []
+        self.verbose = verbose
+        self.split_rule = split_rule
+        self._rng = random.Random()
+        # Working copy of the deck, created on the first round and then reused:
+        # the lazy shuffle only permutes it, so it never has to be rebuilt.
+        self.deck = None
+        # A silent game never takes the verbose branches: bind the stripped
+        # variants once here instead of testing self.verbose on every call.
+        if not verbose:
+            self.deal = self._deal_quiet
+            self.play = self._play_quiet
+            self.play_round = self._play_round_quiet
+            self.reward = self._reward_quiet
+        # Policies that can decide from the hand value alone expose
+        # get_action_fast; look it up once here instead of per turn.
+        self._player_fast = getattr(player, "get_action_fast", None)
+        self._dealer_fast = self.dealer.get_action_fast
+
+    def round(self):
+        """
+        Play one round of black jack. First, the player is asked to take actions until they
+        either stand or have more than 21 points. The return value of this function is the 
+        amount of money the player won.
+        """
+        if self.deck is None:
+            self.deck = list(self.cards)
+        self.deck_pos = 0
+        self.dealer_cards.clear()
+        self.player_cards.clear()
+        self.bet = 2
+        self.player.reset()
+        self.dealer.reset()
+        for i in range(2):
+            self.deal(self.player_cards, self.player.name)
+            self.deal(self.dealer_cards, self.dealer.name, i < 1)
+        return self.play_round()
+        
+        
+    def continue_round(self, player_cards, dealer_cards, bet):
+        """
+        Like round, but allows passing an initial game state in order to finish a partially played game.
+       
+        player_cards are the cards the player has in their hand
+        dealer_cards are the visible cards (typically 1) of the dealer 
+        bet is the current bet of the player 
+        
+        Note: For best results create a *new* Game object with a deck that has player_cards and dealer_cards removed.
+        """
+        if self.deck is None:
+            self.deck = list(self.cards)
+        self.deck_pos = 0
+        self.bet = bet
+        self.player_cards.clear()
+        self.player_cards.extend(player_cards)
+        self.dealer_cards.clear()
+        self.dealer_cards.extend(dealer_cards)
+        while len(self.dealer_cards) < 2:
+            self.deal(self.dealer_cards, self.dealer.name)
+        return self.play_round()
+        
+    def play_round(self):
+        """
+        Function used to actually play a round of blackjack after the initial setup done in round or continue_round.
+        
+        Will first let the player take their actions and then proceed with the dealer.
+        """
+        hands = self.play(self.player, self.player_cards)
+        if self.verbose:
+            print("Dealer reveals: ", format(self.dealer_cards[-1]))
+            print("Dealer has:", format(self.dealer_cards), "(%.1f points)"%get_value(self.dealer_cards))
+        ((_, self.dealer_value),) = self.play(self.dealer, self.dealer_cards)
+        reward = sum(self.reward(c, value) for (c, value) in hands)
+        if self.verbose:
+            print("Bet:", self.bet, "won:", reward, "\n")
+        return reward
+
+    def _play_round_quiet(self):
+        """
+        play_round without the verbose branches, bound as play_round on silent games.
+        """
+        hands = self.play(self.player, self.player_cards)
+        ((_, self.dealer_value),) = self.play(self.dealer, self.dealer_cards)
+        return sum(self.reward(c, value) for (c, value) in hands)
+
+    def deal(self, cards, name, public=True):
+        """
+        Deal the next card to the given hand, returning it.
+        """
+        card = self._deal_quiet(cards, name)
+        if public:
+            print(name, "draws", format(card))
+        return card
+
+    def _deal_quiet(self, cards, name, public=True):
+        """
+        Deal the next card to the given hand, returning it; bound as deal on silent games.
+        The deck is shuffled lazily (partial Fisher-Yates): each deal swaps a uniformly
+        chosen not-yet-drawn card into position, so only as much shuffling is done as
+        there are cards actually drawn.
+        """
+        j = self._rng.randrange(self.deck_pos, len(self.deck))
+        self.deck[self.deck_pos], self.deck[j] = self.deck[j], self.deck[self.deck_pos]
+        card = self.deck[self.deck_pos]
+        self.deck_pos += 1
+        cards.append(card)
+        return card
+
+    def play(self, player, cards, cansplit=True, postfix=""):
+        """
+        Play a round of blackjack for *one* participant (player or dealer).
+        The hand value is tracked incrementally as a (total, aces) pair, so only
+        newly dealt cards are inspected rather than rescanning the whole hand.
+        Returns a list of (cards, value) pairs, one per hand played.
+
+        Note that a player may only split once, and only if the split_rule is satisfied (either two cards of the same rank, or of the same value)
+        """
+        total = 0
+        aces = 0
+        for c in cards:
+            total += c.value
+            if c.rank == "Ace":
+                aces += 1
+        while soft_value(total, aces) < 21:
+            if len(cards) == 2 and cansplit and self.split_rule(cards[0], cards[1]):
+                actions = _SPLIT_ACTIONS
+            else:
+                actions = _BASE_ACTIONS
+            act = player.get_action(cards, actions, self.dealer_cards[:1])
+            if act in actions:
+                print(player.name, "does", act.name)
+                if act == _STAND:
+                    break
+                if act == _HIT or act == _DOUBLE_DOWN:
+                    card = self.deal(cards, player.name)
+                    total += card.value
+                    if card.rank == "Ace":
+                        aces += 1
+                if act == _DOUBLE_DOWN:
+                    self.bet *= 2
+                    break
+                if act == _SPLIT:
+                    pilea = cards[:1]
+                    pileb = cards[1:]
+                    print(player.name, "now has 2 hands")
+                    print("Hand 1:", format(pilea))
+                    print("Hand 2:", format(pileb))
+                    return (self.play(player, pilea, False, " (hand 1)")
+                            + self.play(player, pileb, False, " (hand 2)"))
+        value = soft_value(total, aces)
+        print(player.name, "ends with%s"%(postfix), format(cards), "with value", value, "\n")
+        return [(cards, value)]
+
+    def _play_quiet(self, player, cards, cansplit=True, postfix=""):
+        """
+        play without the verbose output, bound as play on silent games; decisions go
+        through a policy's get_action_fast when it has one, skipping the hand rescan.
+        Keep the game logic in sync with play.
+        """
+        total = 0
+        aces = 0
+        for c in cards:
+            total += c.value
+            if c.rank == "Ace":
+                aces += 1
+        fast = self._dealer_fast if player is self.dealer else self._player_fast
+        dealer_up = self.dealer_cards[0].value
+        while True:
+            value = soft_value(total, aces)
+            if value >= 21:
+                break
+            if len(cards) == 2 and cansplit and self.split_rule(cards[0], cards[1]):
+                actions = _SPLIT_ACTIONS
+            else:
+                actions = _BASE_ACTIONS
+            if fast is not None:
+                act = fast(value, dealer_up)
+            else:
+                act = player.get_action(cards, actions, self.dealer_cards[:1])
+            if act in actions:
+                if act == _STAND:
+                    break
+                if act == _HIT or act == _DOUBLE_DOWN:
+                    card = self.deal(cards, player.name)
+                    total += card.value
+                    if card.rank == "Ace":
+                        aces += 1
+                if act == _DOUBLE_DOWN:
+                    self.bet *= 2
+                    break
+                if act == _SPLIT:
+                    return (self.play(player, cards[:1], False)
+                            + self.play(player, cards[1:], False))
+        return [(cards, soft_value(total, aces))]
+
+    def reward(self, player_cards, pscore):
+        """
+        Calculate amount of money won by the player. Blackjack pays 3:2.
+        """
+        print(self.player.name + ":", format(player_cards), "(%.1f points)"%(pscore))
+        print(self.dealer.name + ":", format(self.dealer_cards), "(%.1f points)"%(self.dealer_value))
+        return self._reward_quiet(player_cards, pscore)
+
+    def _reward_quiet(self, player_cards, pscore):
+        """
+        The reward calculation without the verbose output, bound as reward on silent games.
+        """
+        dscore = self.dealer_value
+        if pscore > 21:
+            return -self.bet
+        result = -self.bet
+        if pscore > dscore or dscore > 21:
+            if pscore == 21 and len(self.player_cards) == 2:
+                result = 3*self.bet/2
+            result = self.bet
+        if pscore == dscore and (pscore != 21 or len(self.player_cards) != 2):
+            result = 0
+        return result
+        
+        
+player_types = {"default": Player, "timid": TimidPlayer, "basic": BasicStrategyPlayer, "mcts": MCTSPlayer, "console": ConsolePlayer}
+
+# Our implementation allows us to define different deck "types", such as only even cards, 
+# or even use made-up card values like "1.5"
+
+# Each deck type maps to a factory so importing the module does not build every
+# deck (or draw from the global RNG for the "random" one); the chosen deck is
+# only generated when requested in main.
+deck_types = {"default": lambda: generate_deck(),
+              "high": lambda: generate_deck(ranks=[("2", 2), ("10", 10), ("Ace", 11), ("Fool", 12)]),
+              "low": lambda: generate_deck(ranks=[("1.5", 1.5), ("2", 2),("2.2", 2.2), ("3", 3), ("3", 4), ("Ace", 11)], suits=["Hearts", "Spades", "Clubs", "Diamonds", "Swords", "Wands", "Bows"]),
+              "even": lambda: generate_deck(ranks=[("2",2), ("4",4), ("6",6), ("8",8), ("10",10), ("Jack",10), ("Queen",10), ("King",10)]),
+              "odd": lambda: generate_deck(ranks=[("3",3), ("5",5), ("7",7), ("9",9), ("Ace",11)]),
+              "red": lambda: generate_deck(suits=["Diamonds", "Hearts"]),
+              "random": lambda: generate_deck(ranks=random.sample([("2",2), ("3",3), ("4",4), ("5",5), ("6",6), ("7",7), ("8",8), ("9",9), ("10",10), ("Jack",10), ("Queen",10), ("King",10), ("Ace",11)], random.randint(5,13)))}
+
+def main(ptype="default", dtype="default", n=100, split_rule=same_value, verbose=True):
+    deck = deck_types[dtype]()
+    g = Game(deck, player_types[ptype]("Sir Gladington III, Esq.", deck[:]), split_rule, verbose)
+    points = []
+    for i in range(n):
+        points.append(g.round())
+    print("Average points: ", sum(points)*1.0/n)
+    
+
+# run `python blackjack.py --help` for usage information
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run a simulation of a Blackjack agent.')
+    parser.add_argument('player', nargs="?", default="default", 
+                        help='the player type (available values: %s)'%(", ".join(player_types.keys())))
+    parser.add_argument('-n', '--count', dest='count', action='store', default=100,
+                        help='How many games to run')
+    parser.add_argument('-s', '-q', '--silent', '--quiet', dest='verbose', action='store_const', default=True, const=False,
+                        help='Do not print game output (only average score at the end is printed)')
+    parser.add_argument('-r', '--rank', '--rank-split', dest='split', action='store_const', default=same_value, const=same_rank,
+                        help="Only allow split when the player's cards have the same rank (default: allow split when they have the same value)")
+    parser.add_argument('-d', "--deck", metavar='D', dest="deck", nargs=1, default=["default"], 
+                        help='the deck type to use (available values: %s)'%(", ".join(deck_types.keys())))
+    args = parser.parse_args()
+    if args.player not in player_types:
+        print("Invalid player type: %s. Available options are: \n%s"%(args.player, ", ".join(player_types.keys())))
+        sys.exit(-1)
+    if args.deck[0] not in deck_types:
+        print("Invalid deck type: %s. Available options are: \n%s"%(args.deck, ", ".join(deck_types.keys())))
+        sys.exit(-1)
     main(args.player, args.deck[0], int(args.count), args.split, args.verbose)
\ No newline at end of file